@@ -249,7 +249,16 @@ for i,qi in enumerate(q):
 #
 # Solve the Linear System on Each Mesh
 # 
-xi = [Kernel(qi,F=lambda q: 0.01 + np.exp(q)) for qi in q]
+def diffusion_coefficient(q):
+    """
+    Elementwise diffusion coefficient xi(q) = 0.01 + exp(q), evaluated
+    in place to avoid allocating a temporary at every quadrature sweep.
+    """
+    xi = np.exp(q)
+    xi += 0.01
+    return xi
+
+xi = [Kernel(qi,F=diffusion_coefficient) for qi in q]
 u = []
 for i in range(3):
     
@@ -1335,7 +1335,10 @@ class Form(object):
                     f_loc_det = np.dot(test.T, np.dot(np.diag(wg[region]*Ker),trial))
                     f_loc += f_loc_det.reshape((n_dofs_test*n_dofs_trial,), order='F')
                     '''
-                    f_loc += np.dot(test.T, np.dot(np.diag(wg[region]*Ker),trial))
+                    # Row-scale the trial functions by broadcasting -
+                    # same as multiplying by diag(w*Ker) without the
+                    # O(n_gauss^2) diagonal matrix
+                    f_loc += np.dot(test.T, (wg[region]*Ker)[:,None]*trial)
                 else:
                     #
                     # Sampled kernel
@@ -1346,8 +1349,10 @@ class Form(object):
                         f_loc_smp.append(np.dot(test.T, (trial[:,i]*wKer.T).T))
                     f_loc += np.concatenate(f_loc_smp, axis=0)
                     '''
-                    for i in range(n_dofs_trial):
-                        f_loc[:,i,:] += np.dot(test.T, (trial[:,i]*wKer.T).T)
+                    # Contract over the Gauss points for all trial dofs
+                    # and samples at once, instead of one matrix product
+                    # per trial dof
+                    f_loc += np.einsum('gi,gj,gs->ijs', test, trial, wKer)
 
 
         #
@@ -1579,8 +1584,8 @@ class IIForm(Form):
                 #
                 # Compute local integral
                 #
-                # Weight shape functions
-                Wphi = np.diag(w_g).dot(phi_g)
+                # Weight shape functions (row scaling by broadcast)
+                Wphi = w_g[:,None]*phi_g
 
                 # Combine
                 f_loc += C_loc.dot(Wphi)
@@ -1728,9 +1733,9 @@ class IPForm(Form):
                 #
                 # Compute local integral
                 #
-                # Weight shape functions
-                Wphii = np.diag(wi_g).dot(phii)
-                Wphij = np.diag(wj_g).dot(phij)
+                # Weight shape functions (row scaling by broadcast)
+                Wphii = wi_g[:,None]*phii
+                Wphij = wj_g[:,None]*phij
 
                 # Combine
                 f_loc += np.dot(Wphii.T, C_loc.dot(Wphij))
@@ -2353,6 +2358,12 @@ class Assembler(object):
         #
         sf = self.subforest_flag()
         cells = self.mesh().cells.get_leaves(subforest_flag=sf)
+
+        # Shape function data reused across the double cell loop of
+        # integral forms - computed once per cell instead of once per
+        # cell pair
+        shape_cache = {}
+
         for ci in cells:
             #
             # Compute shape functions on cell
@@ -2431,9 +2442,13 @@ class Assembler(object):
                         #
                         for cj in cells:
                             #
-                            # Compute shape function on cell
+                            # Look up (or compute) shape functions on
+                            # cell - the double loop revisits each cell
+                            # once per partner cell
                             #
-                            xj_g, wj_g, phij, dofsj = self.shape_eval(cj)
+                            if cj not in shape_cache:
+                                shape_cache[cj] = self.shape_eval(cj)
+                            xj_g, wj_g, phij, dofsj = shape_cache[cj]
 
                             #
                             # Evaluate integral form
@@ -3889,7 +3904,10 @@ class Assembler(object):
         I = self.interpolate(marker_coarse, marker_fine)
         I = I.toarray()
         Q,R = linalg.qr(I, mode='economic')
-        R = linalg.solve(R, Q.T)
+
+        # R is upper triangular, so use a triangular solve (trtrs)
+        # rather than a general LU factorization
+        R = linalg.solve_triangular(R, Q.T, lower=False, check_finite=False)
         if u_fine is None:
             return R
         else:
@@ -4062,10 +4080,11 @@ class AssembledForm(object):
             # Postprocess dofs-vals for bilinear forms
             #
 
-            # Form grid of dofs
-            R, C = np.meshgrid(*dofs)
-            dofs[0] = list(R.ravel())
-            dofs[1] = list(C.ravel())
+            # Form all dof pairs directly - tile/repeat reproduce the
+            # raveled meshgrid without materializing the 2-D grids
+            n_test, n_trial = len(dofs[0]), len(dofs[1])
+            dofs[0] = list(np.tile(dofs[0], n_trial))
+            dofs[1] = list(np.repeat(dofs[1], n_test))
 
             n_entries = len(dofs[0])
             
@@ -4196,6 +4215,20 @@ class AssembledForm(object):
         vals = cell_data['vals']
 
         dim = self.dim()
+        if not hng and not dir_bc:
+            #
+            # No hanging nodes or Dirichlet conditions on this cell:
+            # every entry passes through unmodified, so the triplets can
+            # be appended in bulk instead of popping them one at a time
+            #
+            for i in range(dim):
+                data['dofs'][i].extend(cell_data['dofs'][i])
+            data['vals'].extend(vals)
+
+            if clear_cellwise_data:
+                self.clear_cellwise_data(cell)
+            return
+
         if dim == 0:
             #
             # Constant form
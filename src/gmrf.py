@@ -26,8 +26,11 @@ from mesh import QuadMesh
 
 # Builtins 
 from numbers import Number, Real
+import functools
+import weakref
 import numpy as np
 from scipy import linalg
+from scipy.spatial.distance import cdist, pdist, squareform
 from scipy.special import kv, gamma
 import scipy.sparse as sp
 from scipy.sparse import linalg as spla
@@ -78,44 +81,65 @@ def modchol_ldlt(A,delta=None):
     n = max(A.shape)
 
     L,D,p = linalg.ldl(A)  # @UndefinedVariable
-    DMC = np.eye(n)
-        
+
+    #
+    # Partition the block diagonal of D: a nonzero superdiagonal entry marks
+    # the start of a 2-by-2 pivot block, all remaining entries are 1-by-1
+    # blocks (blocks do not overlap).
+    #
+    two_by_two = np.flatnonzero(np.diagonal(D,1))
+    one_by_one = np.ones(n, dtype=bool)
+    one_by_one[two_by_two] = False
+    one_by_one[two_by_two+1] = False
+
     # Modified Cholesky perturbations.
-    k = 0
-    while k < n:
-        one_by_one = False
-        if k == n-1:
-            one_by_one = True
-        elif D[k,k+1] == 0:
-            one_by_one = True
-            
-        if one_by_one:
-            #            
-            # 1-by-1 block
-            #
-            if D[k,k] <= delta:
-                DMC[k,k] = delta
-            else:
-                DMC[k,k] = D[k,k]
-         
-            k += 1
-      
-        else:  
-            #            
-            # 2-by-2 block
-            #
-            E = D[k:k+2,k:k+2]
-            T,U = linalg.eigh(E)
-            T = np.diag(T)
-            for ii in range(2):
-                if T[ii,ii] <= delta:
-                    T[ii,ii] = delta
-            
-            temp = np.dot(U,np.dot(T,U.T))
-            DMC[k:k+2,k:k+2] = (temp + temp.T)/2  # Ensure symmetric.
-            k += 2
-
-    P = sp.diags([1],0,shape=(n,n), format='coo') 
+    #
+    # 1-by-1 blocks: clamp all diagonal entries to delta in one pass
+    #
+    i_11 = np.flatnonzero(one_by_one)
+    d_11 = np.maximum(np.diagonal(D)[i_11], delta)
+
+    #
+    # 2-by-2 blocks: clamp the eigenvalues of each block, using the closed
+    # form eigendecomposition of a symmetric 2-by-2 matrix [[a,b],[b,c]].
+    # This covers all blocks in a handful of vectorized operations, instead
+    # of one LAPACK call per block.
+    #
+    a = D[two_by_two,two_by_two]
+    b = D[two_by_two,two_by_two+1]
+    c = D[two_by_two+1,two_by_two+1]
+
+    # Eigenvalues: tr/2 -/+ sqrt((a-c)^2/4 + b^2), clamped to delta
+    half_tr = 0.5*(a+c)
+    disc = np.sqrt(0.25*(a-c)**2 + b**2)
+    t1 = np.maximum(half_tr-disc, delta)
+    t2 = np.maximum(half_tr+disc, delta)
+
+    # Normalized eigenvectors u_i = (b, l_i-a)/|(b, l_i-a)|
+    # (b is nonzero by construction of the 2-by-2 blocks)
+    w1 = np.hypot(b, half_tr-disc-a)
+    u11, u12 = b/w1, (half_tr-disc-a)/w1
+    w2 = np.hypot(b, half_tr+disc-a)
+    u21, u22 = b/w2, (half_tr+disc-a)/w2
+
+    # Reconstruct t1*u1*u1' + t2*u2*u2' (symmetric by construction)
+    m_aa = t1*u11**2 + t2*u21**2
+    m_ab = t1*u11*u12 + t2*u21*u22
+    m_cc = t1*u12**2 + t2*u22**2
+
+    #
+    # Assemble DMC directly as a sparse block diagonal matrix: only the
+    # 1-by-1 and 2-by-2 block entries are stored (O(n) memory), instead of
+    # scattering them into a dense n-by-n identity.
+    #
+    rows = np.concatenate((i_11, two_by_two, two_by_two,
+                           two_by_two+1, two_by_two+1))
+    cols = np.concatenate((i_11, two_by_two, two_by_two+1,
+                           two_by_two, two_by_two+1))
+    vals = np.concatenate((d_11, m_aa, m_ab, m_ab, m_cc))
+    DMC = sp.coo_matrix((vals, (rows, cols)), shape=(n,n)).tocsr()
+
+    P = sp.diags([1],0,shape=(n,n), format='coo')
     P.row = P.row[p]
     P = P.tocsr()
     
@@ -126,33 +150,107 @@ def modchol_ldlt(A,delta=None):
     return L, DMC, P, D
     
     
-def diagonal_inverse(d, eps=None):
+def pivoted_cholesky(A, tol=None):
+    """
+    Low-rank pivoted Cholesky decomposition of a symmetric positive
+    semidefinite matrix,
+
+        L = pivoted_cholesky(A, tol)
+
+    computes an (n,r) factor L with A ~= L*L', where the rank r is
+    determined adaptively: pivots are chosen greedily as the largest
+    remaining diagonal entry of the Schur complement, and the iteration
+    stops once that entry drops below tol. For covariance matrices of
+    smooth kernels, whose spectra decay geometrically, r << n, so the
+    factorization costs O(n*r^2) work and O(n*r) memory instead of the
+    O(n^3)/O(n^2) of a full decomposition - and sampling reduces to
+    L*z with only r standard normal deviates.
+
+    Reference:
+    H. Harbrecht, M. Peters and R. Schneider. On the low-rank
+    approximation by the pivoted Cholesky decomposition. Appl. Numer.
+    Math., 62(4):428-440, 2012.
+
+    Inputs:
+
+        A: double, (n,n) symmetric positive semidefinite matrix
+
+        tol: double >0, truncation tolerance for the trace of the
+            residual (defaults to n*eps*max(diag(A))).
+
+    Outputs:
+
+        L: double, (n,r) low-rank factor with A ~= L*L'
+    """
+    A = np.asarray(A)
+    n = A.shape[0]
+
+    # Residual diagonal of the Schur complement
+    d = np.array(np.diagonal(A), dtype=float)
+
+    if tol is None:
+        eps = np.finfo(float).eps
+        tol = n*eps*max(d.max(), 1)
+    else:
+        assert tol > 0, 'Input "tol" should be positive.'
+
+    L = np.zeros((n,n))
+    r = 0
+    while r < n:
+        #
+        # Greedy pivot: largest remaining diagonal entry
+        #
+        p = np.argmax(d)
+        if d[p] <= tol:
+            break
+
+        #
+        # New column = pivot column of the Schur complement, scaled
+        #
+        l = (A[:,p] - L[:,:r].dot(L[p,:r]))/np.sqrt(d[p])
+        L[:,r] = l
+
+        # Downdate the residual diagonal
+        d -= l**2
+        d[p] = 0
+
+        r += 1
+
+    return L[:,:r]
+
+
+def diagonal_inverse(d, eps=None, as_diag=False):
     """
     Compute the (approximate) pseudo-inverse of a diagonal matrix with
-    diagonal entries d. 
-    
+    diagonal entries d.
+
     Inputs:
-    
+
         d: double, (n, ) vector of diagonal entries
-        
+
         eps: cut-off tolerance for zero entries
+
+        as_diag: bool [False], return only the (n, ) vector of inverted
+            diagonal entries, instead of materializing the full (n,n) matrix
     """
     if eps is None:
         eps = np.finfo(float).eps
     else:
         assert eps > 0, 'Input "eps" should be positive.'
-    
+
     if len(d.shape)==2:
         #
         # Matrix
-        # 
+        #
         d = d.diagonal()
-        
+
     d_inv = np.zeros(d.shape)
     i_nz = np.abs(d)>eps
     d_inv[i_nz] = 1/d[i_nz]
+    if as_diag:
+        return d_inv
     D_inv = np.diag(d_inv)
-    
+
     return D_inv
 
 
@@ -165,78 +263,160 @@ Commonly used covariance functions
 For each function, we assume the input is given by two d-dimensional
 vectors of length n. 
 """
-def distance(x, y, M=None, periodic=False, box=None):
+def _validate_M(M, dim):
     """
-    Compute the Euclidean distance vector between rows in x and rows in y
-    
-    Inputs: 
-    
+    Check that the anisotropy tensor M is a symmetric positive
+    semidefinite (dim,dim) matrix
+
+    Validated arrays are remembered (by identity, via weak references),
+    so repeated distance evaluations with the same M skip the O(dim^3)
+    eigenvalue check after the first call.
+    """
+    if _validated_M.get(id(M)) is M:
+        return
+    assert M.shape == (dim,dim), \
+    'Input "M" should be a (%d,%d) matrix.'%(dim,dim)
+    assert all(np.linalg.eigvals(M)>=0) and \
+           np.allclose(M,M.transpose()),\
+           'M should be symmetric positive definite.'
+    _validated_M[id(M)] = M
+
+# Anisotropy tensors that have already passed _validate_M
+_validated_M = weakref.WeakValueDictionary()
+
+
+def distance_sq(x, y, M=None, periodic=False, box=None, out=None):
+    """
+    Compute the squared Euclidean distance vector between rows in x and
+    rows in y
+
+    Covariance kernels of the squared distance (e.g. gaussian, rational)
+    should use this primitive directly - it saves the sqrt pass over the
+    distance buffer that distance() would otherwise spend.
+
+    Inputs:
+
         x,y: two (n,dim) arrays
-        
-        M: double, positive semidefinite anistropy coefficient 
-        
+
+        M: double, positive semidefinite anistropy coefficient
+
         periodic: bool [False], indicates a toroidal domain
-        
-        box: double, tuple representing the bounding box, i.e. 
+
+        box: double, tuple representing the bounding box, i.e.
             1D: box = (x_min, x_max)
-            2D: box = (x_min, x_max, y_min, y_max) 
+            2D: box = (x_min, x_max, y_min, y_max)
             If periodic is True, then box should be specified.
-        
-    Outputs: 
-    
-        d: double, (n,1) vector ||x[i]-y[i]||_M of (M-weighted) 
+
+        out: double, optional (n,dim) work array for the componentwise
+            differences - pass it to reuse memory across repeated kernel
+            evaluations.
+
+    Outputs:
+
+        d2: double, (n,) vector ||x[i]-y[i]||_M^2 of squared (M-weighted)
             Euclidean distances
-         
+
     """
-    # Check wether x and y have the same dimensions 
+    # Check wether x and y have the same dimensions
     assert x.shape == y.shape, 'Vectors x and y have incompatible shapes.'
     dim = x.shape[1]
-    
-    if dim==1:
-        #
-        # 1D
-        #
-        # Periodicity
-        if periodic:
-            assert box is not None, \
-            'If periodic, bounding box must be specified.'
-            
-            x_min, x_max = box
-            w  = x_max - x_min
-            dx = np.min(np.array([np.abs(x-y), w - np.abs(x-y)]),axis=0)
-        else:
-            dx = np.abs(x-y)
-        # "Anisotropy"    
-        if M is None:
-            return dx
-        else:
-            assert isinstance(M, Real) and M>=0, \
-            'For one dimensional covariance, input "M" '+\
-            'is a positive number.'
-            return np.sqrt(M)*dx
-    elif dim==2:
-        #
-        # 2D
-        #   
-        dx = np.abs(x[:,0]-y[:,0])
-        dy = np.abs(x[:,1]-y[:,1])
-        if periodic:
-            assert box is not None, \
-            'If periodic, bounding box must be specified.'
-            x_min, x_max, y_min, y_max = box
-            dx = np.min(np.array([dx,(x_max-x_min)-dx]),axis=0)
-            dy = np.min(np.array([dy,(y_max-y_min)-dy]),axis=0)
-        
-        if M is None:
-            return np.sqrt(dx**2 + dy**2)
-        else:
-            assert all(np.linalg.eigvals(M)>=0) and \
-                   np.allclose(M,M.transpose()),\
-                   'M should be symmetric positive definite.'
-            
-            ddx = np.array([dx,dy])
-            Mddx = np.dot(M, ddx).T
-            return np.sqrt(np.sum(ddx.T*Mddx, axis=1))
+
+    #
+    # Componentwise differences (in absolute value), computed in a single
+    # dimension-agnostic pass, without intermediate arrays.
+    #
+    diff = np.subtract(x, y, out=out)
+    np.abs(diff, out=diff)
+
+    #
+    # Periodicity: wrap the differences around the toroidal domain
+    #
+    if periodic:
+        assert box is not None, \
+        'If periodic, bounding box must be specified.'
+
+        widths = np.asarray(box, dtype=float).reshape(dim,2)
+        widths = widths[:,1] - widths[:,0]
+        np.minimum(diff, widths - diff, out=diff)
+
+    #
+    # Squared distances, fused into a single multiply-add pass via einsum
+    # (no (dim,n) stacked temporaries).
+    #
+    if M is None:
+        d2 = np.einsum('ni,ni->n', diff, diff)
+    elif dim==1:
+        # "Anisotropy"
+        assert isinstance(M, Real) and M>=0, \
+        'For one dimensional covariance, input "M" '+\
+        'is a positive number.'
+        d2 = M*np.einsum('ni,ni->n', diff, diff)
+    else:
+        _validate_M(M, dim)
+        d2 = np.einsum('ni,ij,nj->n', diff, M, diff)
+    return d2
+
+
+def _distance_sq_panel(xb, yb, M=None, periodic=False, box=None):
+    """
+    Squared (M-weighted) distances between all pairs of rows in xb and yb
+
+    Unlike distance_sq, which pairs rows one-to-one, this returns the
+    full (m,p) panel of pair distances, contracted across point pairs in
+    a single einsum pass.
+
+    Inputs:
+
+        xb, yb: double, (m,dim) and (p,dim) arrays of points
+
+        M, periodic, box: see distance_sq
+
+    Outputs:
+
+        d2: double, (m,p) panel with d2[i,j] = ||xb[i]-yb[j]||_M^2
+    """
+    dim = xb.shape[1]
+    diff = np.abs(xb[:,None,:] - yb[None,:,:])
+    if periodic:
+        assert box is not None, \
+        'If periodic, bounding box must be specified.'
+
+        widths = np.asarray(box, dtype=float).reshape(dim,2)
+        widths = widths[:,1] - widths[:,0]
+        np.minimum(diff, widths - diff, out=diff)
+    if M is None:
+        return np.einsum('ijk,ijk->ij', diff, diff)
+    elif dim==1:
+        return M*np.einsum('ijk,ijk->ij', diff, diff)
+    else:
+        return np.einsum('ijk,kl,ijl->ij', diff, M, diff)
+
+
+def distance(x, y, M=None, periodic=False, box=None):
+    """
+    Compute the Euclidean distance vector between rows in x and rows in y
+
+    Inputs:
+
+        x,y: two (n,dim) arrays
+
+        M: double, positive semidefinite anistropy coefficient
+
+        periodic: bool [False], indicates a toroidal domain
+
+        box: double, tuple representing the bounding box, i.e.
+            1D: box = (x_min, x_max)
+            2D: box = (x_min, x_max, y_min, y_max)
+            If periodic is True, then box should be specified.
+
+    Outputs:
+
+        d: double, (n,) vector ||x[i]-y[i]||_M of (M-weighted)
+            Euclidean distances
+
+    """
+    d2 = distance_sq(x, y, M=M, periodic=periodic, box=box)
+    return np.sqrt(d2, out=d2)
 
 
 def constant(x,y,sgm=1):
@@ -257,8 +437,11 @@ def constant(x,y,sgm=1):
     """
     assert x.shape == y.shape, \
     'Input arrays have incompatible shapes.'
-    
-    return sgm*np.ones(x.shape[0])
+
+    #
+    # Read-only broadcast view - avoids allocating an n-vector of copies
+    #
+    return np.broadcast_to(np.asarray(sgm, dtype=float), (x.shape[0],))
 
     
 def linear(x,y,sgm=1, M=None):
@@ -277,29 +460,15 @@ def linear(x,y,sgm=1, M=None):
      
     """
     dim = x.shape[1]
-    if dim==1:
-        #
-        # 1D
-        # 
-        if M is None:
-            sgm**2 + x*y
-            return sgm**2 + x*y
-        else:
-            assert isinstance(M,Real), 'Input "M" should be a scalar.'
-            return x*M*y
-        
-    elif dim==2:
-        #
-        # 2D
-        #  
-        if M is None:
-            return sgm**2 + np.sum(x*y, axis=1)
-        else:
-            assert M.shape == (2,2), 'Input "M" should be a 2x2 matrix.'
-            My = np.dot(M, y.T).T
-            return sgm**2 + np.sum(x*My, axis=1)
-    else: 
-        raise Exception('Only 1D and 2D supported.')
+    if M is None:
+        return sgm**2 + np.einsum('ni,ni->n', x, y)
+    elif dim==1:
+        assert isinstance(M,Real), 'Input "M" should be a scalar.'
+        return sgm**2 + M*np.einsum('ni,ni->n', x, y)
+    else:
+        assert M.shape == (dim,dim), \
+            'Input "M" should be a %dx%d matrix.'%(dim,dim)
+        return sgm**2 + np.einsum('ni,ij,nj->n', x, M, y)
 
 
 def gaussian(x, y, sgm=1, l=1, M=None, periodic=False, box=None):
@@ -309,8 +478,16 @@ def gaussian(x, y, sgm=1, l=1, M=None, periodic=False, box=None):
         C(x,y) = exp(-|x-y|^2/(2l^2))
     
     """
-    d = distance(x, y, M, periodic=periodic, box=box)
-    return sgm**2*np.exp(-d**2/(2*l**2))
+    d2 = distance_sq(x, y, M, periodic=periodic, box=box)
+    return _gaussian_of_sqdist(d2, sgm=sgm, l=l)
+
+
+def _gaussian_of_sqdist(d2, sgm=1, l=1):
+    """
+    Gaussian kernel as a transform of the squared distance (in place)
+    """
+    d2 *= -0.5/l**2
+    return sgm**2*np.exp(d2, out=d2)
 
 
 def exponential(x, y, sgm=1, l=0.1, M=None, periodic=False, box=None):
@@ -326,7 +503,15 @@ def exponential(x, y, sgm=1, l=0.1, M=None, periodic=False, box=None):
         l: range parameter
     """
     d = distance(x, y, M, periodic=periodic, box=box)
-    return sgm**2*np.exp(-d/l)
+    return _exponential_of_dist(d, sgm=sgm, l=l)
+
+
+def _exponential_of_dist(d, sgm=1, l=0.1):
+    """
+    Exponential kernel as a transform of the distance (in place)
+    """
+    d *= -1/l
+    return sgm**2*np.exp(d, out=d)
 
 
 def matern(x, y, sgm, nu, l, M=None, periodic=False, box=None):
@@ -346,12 +531,37 @@ def matern(x, y, sgm, nu, l, M=None, periodic=False, box=None):
     Source: 
     """
     d = distance(x, y, M, periodic=periodic, box=box)
-    K = sgm**2*2**(1-nu)/gamma(nu)*(np.sqrt(2*nu)*d/l)**nu*\
-        kv(nu,np.sqrt(2*nu)*d/l)
+    return _matern_of_dist(d, sgm=sgm, nu=nu, l=l)
+
+
+def _matern_of_dist(d, sgm=1, nu=1.5, l=1):
+    """
+    Matern kernel as a transform of the distance
+    """
+    #
+    # For half-integer shape parameters, use the closed-form expressions of
+    # the Matern kernel - these avoid evaluating the modified Bessel
+    # function elementwise and are much cheaper.
+    #
+    if nu == 0.5:
+        return sgm**2*np.exp(-d/l)
+    elif nu == 1.5:
+        r = np.sqrt(3)*d/l
+        return sgm**2*(1+r)*np.exp(-r)
+    elif nu == 2.5:
+        r = np.sqrt(5)*d/l
+        return sgm**2*(1+r+r**2/3)*np.exp(-r)
     #
-    # Modified Bessel function undefined at d=0, covariance should be 1
+    # General shape parameter: evaluate the modified Bessel function only
+    # where d > 0 - kv is undefined at the origin, where the covariance
+    # equals the variance anyway. This replaces the full-array NaN patch
+    # and skips the expensive Bessel calls on the d=0 entries.
     #
-    K[np.isnan(K)] = 1
+    C = sgm**2*2**(1-nu)/gamma(nu)
+    K = np.full(d.shape, float(sgm)**2)
+    mask = d > 0
+    z = (np.sqrt(2*nu)/l)*d[mask]
+    K[mask] = C*z**nu*kv(nu, z)
     return K
     
     
@@ -362,8 +572,153 @@ def rational(x, y, a, M=None, periodic=False, box=None):
         C(x,y) = 1/(1 + |x-y|^2)^a
          
     """
-    d = distance(x, y, M, periodic=periodic, box=box)
-    return (1/(1+d**2))**a   
+    d2 = distance_sq(x, y, M, periodic=periodic, box=box)
+    return _rational_of_sqdist(d2, a=a)
+
+
+def _rational_of_sqdist(d2, a=1):
+    """
+    Rational kernel as a transform of the squared distance
+    """
+    return (1/(1+d2))**a
+
+
+#
+# Kernels that are pure scalar transforms of the (squared) Euclidean
+# distance: pairwise() routes their distance stage through the compiled
+# cdist kernels when no anisotropy/periodicity is requested.
+#
+_KERNELS_OF_SQDIST = {gaussian: _gaussian_of_sqdist,
+                      rational: _rational_of_sqdist}
+_KERNELS_OF_DIST = {exponential: _exponential_of_dist,
+                    matern: _matern_of_dist}
+
+
+def pairwise(cov_fn, x, block_size=256, **pars):
+    """
+    Evaluate a symmetric covariance kernel at all pairs of points in x
+
+    The kernel is evaluated block by block, so that each panel of point
+    pairs stays cache-resident, and only on the blocks on or above the
+    diagonal - the lower triangle is filled by mirroring. This halves
+    the number of kernel evaluations and avoids materializing the (n,n)
+    index grids of a full outer-product formulation.
+
+    Inputs:
+
+        cov_fn: function, covariance kernel k(x,y,**pars) operating
+            row by row on a pair of (m,dim) arrays
+
+        x: double, (n,dim) array of points
+
+        block_size: int, tile width of the panels the matrix is
+            assembled in - the default keeps a panel and its point pairs
+            within a few hundred KB.
+
+        **pars: kernel parameters, passed through to cov_fn
+
+    Outputs:
+
+        K: double, (n,n) symmetric matrix K[i,j] = k(x[i],x[j])
+    """
+    x = np.asarray(x)
+    n = x.shape[0]
+
+    # Unwrap parameter-bound kernels so that the fast-path dispatch
+    # below still recognizes the underlying function
+    while isinstance(cov_fn, functools.partial):
+        pars = {**cov_fn.keywords, **pars}
+        cov_fn = cov_fn.func
+
+    # The output inherits the working precision of the points, so that
+    # kernels evaluated in reduced precision stay in reduced precision
+    K = np.empty((n,n), dtype=np.result_type(x.dtype, np.float32))
+
+    #
+    # Fast path: kernels that are scalar transforms of the (squared)
+    # distance evaluate whole panels at once, vectorized across point
+    # pairs rather than over flattened pair lists.
+    #
+    if cov_fn in _KERNELS_OF_SQDIST:
+        transform, squared = _KERNELS_OF_SQDIST[cov_fn], True
+    elif cov_fn in _KERNELS_OF_DIST:
+        transform, squared = _KERNELS_OF_DIST[cov_fn], False
+    else:
+        transform = None
+    if transform is not None:
+        M = pars.get('M')
+        periodic = pars.get('periodic', False)
+        box = pars.get('box')
+        if M is None and not periodic:
+            #
+            # Isotropic distances: delegate to cdist's compiled kernels
+            #
+            metric = 'sqeuclidean' if squared else 'euclidean'
+            def dist_panel(xb, yb):
+                return cdist(xb, yb, metric)
+        else:
+            #
+            # Anisotropic and/or periodic distances: one einsum
+            # contraction per panel
+            #
+            def dist_panel(xb, yb):
+                d = _distance_sq_panel(xb, yb, M=M, periodic=periodic,
+                                       box=box)
+                if not squared:
+                    np.sqrt(d, out=d)
+                return d
+        t_pars = {key: val for key, val in pars.items()
+                  if key not in ('M','periodic','box')}
+        for i0 in range(0, n, block_size):
+            i1 = min(i0+block_size, n)
+            for j0 in range(i0, n, block_size):
+                j1 = min(j0+block_size, n)
+                if j0 == i0 and M is None and not periodic:
+                    #
+                    # Diagonal block: pdist evaluates only the upper
+                    # triangle - half the distance and transform work -
+                    # and squareform mirrors it back into a full block
+                    #
+                    xb = x[i0:i1,:]
+                    dc = pdist(xb, metric)
+                    Kb = squareform(transform(dc, **t_pars),
+                                    checks=False)
+                    k0 = transform(np.zeros(1), **t_pars)[0]
+                    np.fill_diagonal(Kb, k0)
+                else:
+                    Kb = transform(dist_panel(x[i0:i1,:], x[j0:j1,:]),
+                                   **t_pars)
+                K[i0:i1,j0:j1] = Kb
+                if j0 > i0:
+                    K[j0:j1,i0:i1] = Kb.T
+        return K
+
+    for i0 in range(0, n, block_size):
+        i1 = min(i0+block_size, n)
+        xb = x[i0:i1,:]
+        m = i1-i0
+        #
+        # Diagonal block: evaluate upper-triangular pairs and mirror
+        #
+        i_upper = np.triu_indices(m)
+        Kb = K[i0:i1,i0:i1]
+        Kb[i_upper] = \
+            np.asarray(cov_fn(xb[i_upper[0],:], xb[i_upper[1],:],
+                              **pars)).ravel()
+        Kb.T[i_upper] = Kb[i_upper]
+        #
+        # Off-diagonal blocks: evaluate all pairs in the panel and
+        # mirror the panel into its transposed slot
+        #
+        for j0 in range(i1, n, block_size):
+            j1 = min(j0+block_size, n)
+            yb = x[j0:j1,:]
+            Kb = np.asarray(cov_fn(np.repeat(xb, j1-j0, axis=0),
+                                   np.tile(yb, (m,1)),
+                                   **pars)).reshape(m, j1-j0)
+            K[i0:i1,j0:j1] = Kb
+            K[j0:j1,i0:i1] = Kb.T
+    return K
 
 '''
 class CovKernel(Kernel):
@@ -435,16 +790,29 @@ class SPDMatrix(object):
     """
     Wrapper Class for semi-positive definite matrices
     """
-    def __init__(self, K):
+    def __init__(self, K, dtype=None):
         """
         Constructor
-             
-        Inputs: 
-        
+
+        Inputs:
+
             K: double, (n,n) symmetric positive semidefinite matrix
-            
+
+            dtype: numpy dtype, optional working precision for the
+                matrix and its factors, e.g. np.float32. Single
+                precision halves the memory traffic of the
+                (memory-bound) solve and multiply kernels at the cost
+                of ~7 digits of accuracy - adequate e.g. for MCMC
+                sampling, not for ill-conditioned solves.
+
         """
         # Initialize Cholesky decomposition
+        if dtype is not None and not isinstance(K, Factor):
+            #
+            # Cast once up front - factors computed from K inherit the
+            # working precision
+            #
+            K = K.astype(dtype)
         if isinstance(K, Factor):
             #
             # Cholesky factor already computed
@@ -462,9 +830,27 @@ class SPDMatrix(object):
             self.__K = K
         
         
+        # Decide sparsity once - several solve paths branch on it and
+        # sp.issparse is a Python-level isinstance chain
+        self.__is_sparse = sp.issparse(self.__K)
+
         # Initialize eigendecomoposition
         self.__d = None
         self.__V = None
+
+        # Initialize cached diagonal scalings and factor products
+        self.__chol_inv_d = None
+        self.__chol_sqrt_d = None
+        self.__chol_inv_sqrt_d = None
+        self.__sqrt_d = None
+        self.__V_sqrt_d = None
+        self.__eig_inv_sqrt_d = None
+        self.__eig_inv_d = None
+        self.__PL = None
+        self.__PL_unit_diag = False
+        self.__sparse_sqrtDinv = None
+        self.__sparse_P_trivial = None
+        self.__chol_trtrs = None
         
     
     def size(self):
@@ -497,7 +883,7 @@ class SPDMatrix(object):
         Returns:
             True if the matrix is sparse, False otherwise.
         """
-        return sp.issparse(self.__K)
+        return self.__is_sparse
 
         
     def get_matrix(self):
@@ -510,15 +896,29 @@ class SPDMatrix(object):
         return self.__K
     
     
-    def chol_decomp(self):
+    def chol_decomp(self, ordering_method=None, mode='supernodal'):
         """
         Compute the cholesky factorization C = LL', where C=M^{-1}K.
-        
-        Decompositions are grouped as follows: 
-        
-        Sparse      cholmod         
-        Full        modchol_ldlt    
-        
+
+        Inputs (sparse matrices only):
+
+            ordering_method: str, fill-reducing ordering passed to
+                CHOLMOD ('natural', 'amd', 'metis', 'nesdis', 'colamd',
+                'default', 'best'). Defaults to 'metis' for large
+                matrices (> 10000 rows), where nested dissection keeps
+                the supernodes dense enough for level-3 BLAS, and to
+                CHOLMOD's own choice otherwise.
+
+            mode: str ('supernodal'), CHOLMOD factorization mode - the
+                supernodal algorithm works on dense blocks (gemm/trsm),
+                the 'simplicial' one column by column.
+
+        Decompositions are grouped as follows:
+
+        Sparse               cholmod
+        Full (PD)            LAPACK cholesky
+        Full (indefinite)    modchol_ldlt
+
         
         The following quantities are stored:
         
@@ -544,19 +944,38 @@ class SPDMatrix(object):
                 #
                 # Try Cholesky (will fail if not PD)
                 #
-                self.__L = cholesky(self.__K.tocsc(), 
-                                    mode='supernodal')
-                
+                if ordering_method is None:
+                    ordering_method = 'metis' if self.size() > 10000 \
+                        else 'default'
+                self.__L = cholesky(self.__K.tocsc(), mode=mode,
+                                    ordering_method=ordering_method)
+
                 self.__chol_type = 'sparse'
+
+                # Set up the solve-chain constants here rather than on
+                # first use, so repeated solves (e.g. sampling loops)
+                # run at full speed from the first call
+                self.__sparse_sqrtDinv = 1/np.sqrt(self.__L.D())
+                P = self.__L.P()
+                self.__sparse_P_trivial = np.array_equal(P,
+                                                         np.arange(len(P)))
                 
             except CholmodNotPositiveDefiniteError:
                 modified_cholesky = True
         else:
             #
-            # Full Matrix 
-            # 
-            modified_cholesky = True
-                
+            # Full matrix - try the blocked LAPACK Cholesky first, and
+            # only fall back to the modified factorization if K turns
+            # out not to be positive definite.
+            #
+            try:
+                c, dummy = linalg.cho_factor(self.__K, lower=True)
+                self.__L = np.tril(c)
+                self.__chol_type = 'full_pd'
+                self.__chol_trtrs = None
+            except linalg.LinAlgError:
+                modified_cholesky = True
+
         if modified_cholesky:
             #
             # Use modified Cholesky
@@ -576,9 +995,26 @@ class SPDMatrix(object):
             #  
             self.__L = L
             self.__D = D
-            self.__P = P 
+            self.__P = P
             self.__D0 = D0
             self.__chol_type = 'full'
+
+            #
+            # Cache the diagonal scalings used by the solve and sqrt
+            # routines, so repeated calls skip the sqrt/division passes
+            #
+            d = D.diagonal()
+            self.__chol_inv_d = 1./d
+            self.__chol_sqrt_d = np.sqrt(d)
+            self.__chol_inv_sqrt_d = 1./self.__chol_sqrt_d
+
+            #
+            # Cache P*L (in Fortran order, so the triangular solves pass
+            # it to LAPACK without copying) and its unit-diagonal flag
+            #
+            PL = np.asfortranarray(P.dot(L))
+            self.__PL = PL
+            self.__PL_unit_diag = bool(np.allclose(np.diagonal(PL), 1))
                 
         
     def chol_type(self):
@@ -620,7 +1056,12 @@ class SPDMatrix(object):
         elif self.chol_type()=='sparse':
             #
             # Return sparse cholesky decomposition
-            #            
+            #
+            return self.__L
+        elif self.chol_type()=='full_pd':
+            #
+            # Return the LAPACK Cholesky factor
+            #
             return self.__L
         elif self.chol_type()=='full':
             #
@@ -655,10 +1096,16 @@ class SPDMatrix(object):
             
             # Check reconstruction LL' = PAP'
             return L.dot(L.T) 
+        elif self.chol_type()=='full_pd':
+            #
+            # LAPACK Cholesky factor
+            #
+            L = self.__L
+            return L.dot(L.T)
         else:
             #
             # Full matrix
-            # 
+            #
             L, D = self.__L, self.__D
             return L.dot(D.dot(L.T))
             
@@ -679,16 +1126,33 @@ class SPDMatrix(object):
             # Use CHOLMOD
             #
             return self.__L(b)
+        elif self.chol_type() == 'full_pd':
+            #
+            # Use LAPACK Cholesky of the positive definite matrix
+            #
+            return linalg.cho_solve((self.__L, True), b,
+                                    check_finite=False)
         else:
             #
             # Use Modified Cholesky
-            # 
-            L, D, P, dummy = self.get_chol_decomp()
-            PL = P.dot(L)
-            y = linalg.solve_triangular(PL,P.dot(b),lower=True, unit_diagonal=True)
-            Dinv = sp.diags(1./np.diagonal(D))
-            z = Dinv.dot(y)
-            x = linalg.solve_triangular(PL.T,z,lower=False,unit_diagonal=True)
+            #
+            # The permuted rhs and the forward-solve output are fresh
+            # temporaries, so the diagonal scale is done in place and both
+            # triangular solves may overwrite their inputs - one pass over
+            # PL forward, one backward, no finiteness scans in between.
+            #
+            dummy1, dummy2, P, dummy3 = self.get_chol_decomp()
+            PL = self.__PL
+            y = linalg.solve_triangular(PL, P.dot(b), lower=True,
+                                        unit_diagonal=True,
+                                        overwrite_b=True, check_finite=False)
+
+            # Diagonal solve as an in-place row scaling
+            inv_d = self.__chol_inv_d
+            y *= inv_d if y.ndim == 1 else inv_d[:,None]
+            x = linalg.solve_triangular(PL.T, y, lower=False,
+                                        unit_diagonal=True,
+                                        overwrite_b=True, check_finite=False)
             return P.T.dot(x)
         
         
@@ -712,43 +1176,66 @@ class SPDMatrix(object):
             #
             # Sparse matrix, use CHOLMOD
             #
-
-            # Build permutation matrix
-            P = self.__L.P()
-            I = sp.diags([1],0, shape=(n,n), format='csc')
-            PP = I[P,:]
-                    
-            # Compute P'L
-            L = self.__L.L()
-            R = PP.T.dot(L)
-            
+            # Work in the factor's natural (fill-reducing) ordering:
+            # with R = P'L one has Rb = P'(Lb) and R'b = L'(Pb).
+            # Permuting the vectors is O(n) per call and avoids
+            # materializing - and keeping resident - reindexed copies
+            # of the factor and its transpose.
+            #
+            f = self.__L
+            L = f.L()
+            if self.__sparse_P_trivial is None:
+                # Remember whether the fill-reducing ordering is the
+                # identity, in which case the permutations are no-ops
+                P = f.P()
+                self.__sparse_P_trivial = np.array_equal(P,
+                                                         np.arange(len(P)))
+            trivial = self.__sparse_P_trivial
             if transpose:
                 #
                 # R'*b
-                # 
-                return R.T.dot(b)
+                #
+                y = b if trivial else f.apply_P(b)
+                return L.T.dot(y)
             else:
                 #
                 # R*b
-                # 
-                return R.dot(b)
+                #
+                y = L.dot(b)
+                return y if trivial else f.apply_Pt(y)
         
+        elif self.chol_type()=='full_pd':
+            #
+            # LAPACK Cholesky factor K = LL'
+            #
+            L = self.__L
+            if transpose:
+                #
+                # L'b
+                #
+                return L.T.dot(b)
+            else:
+                #
+                # Lb
+                #
+                return L.dot(b)
+
         elif self.chol_type()=='full':
             #
             # Cholesky Factor stored as full matrix
-            # 
-            L,D = self.__L, self.__D
-            sqrtD = sp.diags(np.sqrt(np.diagonal(D)))
+            #
+            L = self.__L
+            sqrt_d = self.__chol_sqrt_d
             if transpose:
                 #
                 # R'b
-                # 
-                return sqrtD.dot(L.T.dot(b))
+                #
+                return (L.T.dot(b).T*sqrt_d).T
             else:
                 #
                 # Rb
-                # 
-                return L.dot(sqrtD.dot(b))
+                #
+                return L.dot((b.T*sqrt_d).T)
         
 
     def chol_sqrt_solve(self, b, transpose=False):
@@ -771,68 +1258,154 @@ class SPDMatrix(object):
             # Sparse Matrix
             #
             f = self.__L
-            sqrtDinv = sp.diags(1/np.sqrt(f.D()))
+            if self.__sparse_sqrtDinv is None:
+                #
+                # Cache the diagonal scaling 1/sqrt(D) - f.D() copies a
+                # length-n vector and building a sparse diagonal matrix
+                # from it on every call is pure allocator overhead
+                #
+                self.__sparse_sqrtDinv = 1/np.sqrt(f.D())
+            sqrtDinv = self.__sparse_sqrtDinv
+            if self.__sparse_P_trivial is None:
+                #
+                # Remember whether the fill-reducing ordering is the
+                # identity - if so, the O(n) permutation gathers can be
+                # skipped altogether
+                #
+                P = f.P()
+                self.__sparse_P_trivial = np.array_equal(P,
+                                                         np.arange(len(P)))
+            trivial = self.__sparse_P_trivial
             if transpose:
-                # Solve R' x = b
-                return f.apply_Pt(f.solve_Lt(sqrtDinv.dot(b)))
+                # Solve R' x = b. Scaling the columns directly keeps
+                # the intermediate C-contiguous for the backward solve,
+                # rather than handing CHOLMOD the transposed-broadcast
+                # (Fortran-ordered) view
+                y = b*sqrtDinv if b.ndim == 1 else b*sqrtDinv[:,None]
+                x = f.solve_Lt(y)
+                return x if trivial else f.apply_Pt(x)
             else:
-                # Solve Rx = b 
-                return sqrtDinv.dot(f.solve_L(f.apply_P(b)))
+                # Solve Rx = b. The solve returns a fresh array, so the
+                # diagonal scaling can be fused in place instead of
+                # allocating another n-vector/matrix
+                y = f.solve_L(b if trivial else f.apply_P(b))
+                y *= sqrtDinv if y.ndim == 1 else sqrtDinv[:,None]
+                return y
+        elif self.chol_type() == 'full_pd':
+            #
+            # LAPACK Cholesky factor K = LL'
+            #
+            L = self.__L
+            if self.__chol_trtrs is None:
+                #
+                # Look up the LAPACK triangular solver once - for
+                # repeated small solves the Python-level argument
+                # handling of solve_triangular costs more than the
+                # trtrs call itself
+                #
+                self.__chol_trtrs, = linalg.get_lapack_funcs(('trtrs',),
+                                                             (L,))
+            x, info = self.__chol_trtrs(L, b, lower=1,
+                                        trans=1 if transpose else 0)
+            if info != 0:
+                raise linalg.LinAlgError(
+                    'Triangular solve failed (info=%d).'%info)
+            return x
         else:
             #
             # Full Matrix
             # 
-            L, D, P = self.__L, self.__D, self.__P
-            PL = P.dot(L)
-            sqrtDinv = sp.diags(1/np.sqrt(np.diagonal(D)))
-            unit_diagonal = np.allclose(np.diagonal(PL),1)
+            P = self.__P
+            PL = self.__PL
+            sqrtd_inv = self.__chol_inv_sqrt_d
+            unit_diagonal = self.__PL_unit_diag
             if transpose:
                 #
                 # Solve R' x = b
-                # 
-                y = sqrtDinv.dot(b)
-                
-                x = linalg.solve_triangular(PL.T,y, lower=False, 
-                                             unit_diagonal=unit_diagonal)
+                #
+                y = (b.T*sqrtd_inv).T
+
+                x = linalg.solve_triangular(PL.T, y, lower=False,
+                                            unit_diagonal=unit_diagonal,
+                                            overwrite_b=True,
+                                            check_finite=False)
                 return P.T.dot(x)
             else:
-                y = linalg.solve_triangular(PL, P.dot(b), lower=True, 
-                                            unit_diagonal=unit_diagonal)
-                
-                return sqrtDinv.dot(y)
+                y = linalg.solve_triangular(PL, P.dot(b), lower=True,
+                                            unit_diagonal=unit_diagonal,
+                                            overwrite_b=True,
+                                            check_finite=False)
+
+                return (y.T*sqrtd_inv).T
                 
     
-    def compute_eig_decomp(self, delta=None):
+    def compute_eig_decomp(self, delta=None, k=None, tol=None):
         """
         Compute the singular value decomposition USV' of M^{-1}K
-        
+
         Parameters:
             delta (float, optional): A small positive constant to add to the diagonal of K before computing the eigendecomposition. Defaults to None.
-        """ 
+
+            k (int, optional): Number of dominant eigenpairs to compute. If
+                given, only the k largest eigenvalues (and their vectors) are
+                computed - via LAPACK's subset solver for dense matrices
+                (O(n^2 k) instead of O(n^3)), or Lanczos iteration for sparse
+                ones (O(k nnz), without densifying) - which suffices for
+                truncated KL expansions.
+
+            tol (float, optional): Compute only eigenpairs with eigenvalue
+                above tol. Ignored if k is given.
+        """
         K = self.__K
-        if self.issparse():
-            K = K.toarray()
-            
-        # Compute eigendecomposition
-        d, V = linalg.eigh(K)
-        
+        n = self.size()
+        if self.issparse() and k is not None and k < n:
+            #
+            # Dominant eigenpairs of a sparse matrix: Lanczos iteration
+            # works directly on the sparse operator - O(k*nnz) matvecs
+            # instead of densifying the matrix for an O(n^3) solver
+            #
+            assert 0 < k, 'Input "k" should be in {1,...,n}.'
+            d, V = spla.eigsh(K, k=k, which='LA')
+        else:
+            if self.issparse():
+                K = K.toarray()
+
+            # Compute eigendecomposition (possibly only the dominant
+            # subset)
+            if k is not None:
+                assert 0 < k <= n, 'Input "k" should be in {1,...,n}.'
+                d, V = linalg.eigh(K, subset_by_index=(n-k, n-1))
+            elif tol is not None:
+                d, V = linalg.eigh(K, subset_by_value=(tol, np.inf))
+            else:
+                d, V = linalg.eigh(K)
+
         # Rearrange to ensure decreasing order
         d = d[::-1]
         V = V[:,::-1]
-        
-        
+
+
         # Modify negative eigenvalues
         if delta is None:
             eps = np.finfo(float).eps
-            delta = np.sqrt(eps)*linalg.norm(K, 'fro')
+            if sp.issparse(K):
+                delta = np.sqrt(eps)*spla.norm(K, 'fro')
+            else:
+                delta = np.sqrt(eps)*linalg.norm(K, 'fro')
         d[d<=delta] = delta
         
         
         # Store eigendecomposition
         self.__V = V
         self.__d = d
-    
-    
+
+        # Cache sqrt of eigenvalues for repeated sampling
+        self.__sqrt_d = np.sqrt(d)
+        self.__V_sqrt_d = None
+        self.__eig_inv_sqrt_d = None
+        self.__eig_inv_d = None
+
+
     def set_eig_decomp(self, d, V):
         """
         Store an existing eigendecomposition of the matrix
@@ -847,14 +1420,22 @@ class SPDMatrix(object):
         """
         self.__d = d
         self.__V = V
-        
-    
+        self.__sqrt_d = np.sqrt(d)
+        self.__V_sqrt_d = None
+        self.__eig_inv_sqrt_d = None
+        self.__eig_inv_d = None
+
+
     def eig_reconstruct(self):
         """
         Reconstruct the (modified) matrix from its eigendecomposition
         """
         d, V = self.get_eig_decomp()
-        return V.dot(np.diag(d).dot(V.T))
+
+        # Fold the eigenvalues into V by broadcasting - same result as
+        # V*diag(d)*V' without materializing the diagonal matrix or the
+        # extra n^3 product
+        return (V*d[None,:]).dot(V.T)
     
     
     def has_eig_decomp(self):
@@ -899,8 +1480,22 @@ class SPDMatrix(object):
         
         V = self.__V  # eigenvectors
         d = self.__d  # eigenvalues
-        D_inv = diagonal_inverse(d, eps=eps)
-        return V.dot(D_inv.dot(np.dot(V.T, b)))
+        if eps is None:
+            #
+            # Default cut-off: reuse the cached pseudo-inverse across
+            # repeated solves
+            #
+            if self.__eig_inv_d is None:
+                self.__eig_inv_d = diagonal_inverse(d, as_diag=True)
+            d_inv = self.__eig_inv_d
+        else:
+            d_inv = diagonal_inverse(d, eps=eps, as_diag=True)
+
+        # Scale the fresh V'b product in place - one elementwise pass,
+        # no transposed (Fortran-ordered) intermediates
+        y = np.dot(V.T, b)
+        y *= d_inv if y.ndim == 1 else d_inv[:,None]
+        return V.dot(y)
             
     
     def eig_sqrt(self, x, transpose=False):
@@ -917,13 +1512,19 @@ class SPDMatrix(object):
         
             b = Rx/R'x
         """
-        d, V = self.__d, self.__V
+        if self.__V_sqrt_d is None:
+            #
+            # One-time: fold the sqrt eigenvalue scaling into the
+            # eigenvector matrix, so each application is a single gemm
+            #
+            self.__V_sqrt_d = self.__V*self.__sqrt_d[None,:]
+        R = self.__V_sqrt_d
         if transpose:
             # Sqrt(D)*V'x
-            return np.diag(np.sqrt(d)).dot(V.T.dot(x))
+            return R.T.dot(x)
         else:
             # V*Sqrt(D)*x
-            return V.dot(np.diag(np.sqrt(d)).dot(x))
+            return R.dot(x)
     
     
     def eig_sqrt_solve(self, b, transpose=False):
@@ -939,18 +1540,27 @@ class SPDMatrix(object):
                 to be solved.
         """
         V = self.__V  # eigenvectors
-        d = self.__d  # eigenvalues
-        sqrtD_inv = diagonal_inverse(np.sqrt(d))
+        if self.__eig_inv_sqrt_d is None:
+            #
+            # One-time: pseudo-invert the sqrt eigenvalues, so repeated
+            # solves (e.g. in sampling loops) skip the per-call setup
+            #
+            self.__eig_inv_sqrt_d = diagonal_inverse(self.__sqrt_d,
+                                                     as_diag=True)
+        sqrtd_inv = self.__eig_inv_sqrt_d
         if transpose:
             #
             # Solve sqrtD*V'x = b
-            # 
-            return V.dot(sqrtD_inv.dot(b))
+            #
+            y = b*sqrtd_inv if b.ndim == 1 else b*sqrtd_inv[:,None]
+            return V.dot(y)
         else:
             #
             # Solve V*sqrtD x = b
             #
-            return sqrtD_inv.dot(np.dot(V.T, b))
+            y = np.dot(V.T, b)
+            y *= sqrtd_inv if y.ndim == 1 else sqrtd_inv[:,None]
+            return y
 
 
     def dot(self, b):
@@ -1059,8 +1669,9 @@ class Covariance(SPDMatrix):
     TODO: Class to (i) incorporate CovKernel
     TODO: Initialize Covariance matrix based on an SPDMatrix
     """
-    def __init__(self, dofhandler, discretization='interpolation', 
-                 subforest_flag=None, name=None, parameters={}, cov_fn=None):
+    def __init__(self, dofhandler, discretization='interpolation',
+                 subforest_flag=None, name=None, parameters={}, cov_fn=None,
+                 assembly_dtype=None):
         """
         Constructor
         
@@ -1123,6 +1734,11 @@ class Covariance(SPDMatrix):
             dim: int, dimension of the underlying physical domain
             
             cov_fn: Map, function used to define the covariance kernel
+
+            assembly_dtype: numpy dtype (e.g. np.float32), optional
+                reduced precision in which to evaluate the kernel during
+                assembly - the eigendecomposition and everything
+                downstream remain in double precision.
         """
         #
         # Store parameters
@@ -1132,6 +1748,7 @@ class Covariance(SPDMatrix):
         dofhandler.set_dof_vertices(subforest_flag=subforest_flag)
         self.__dofhandler = dofhandler
         self.__discretization = discretization
+        self.__assembly_dtype = assembly_dtype
         self.__dim = dofhandler.mesh.dim()
         
         #
@@ -1197,11 +1814,30 @@ class Covariance(SPDMatrix):
                 # k(x,y) = 1/(1 + |x-y|^2)^a
                 # 
                 cov_fn = rational
- 
+
         # Store results
         dim = self.dofhandler().mesh.dim()
-        k = Explicit(f=cov_fn, parameters=parameters, n_variables=2, dim=dim)
+
+        # Bind the parameters into the kernel function once, so that
+        # Explicit.eval doesn't re-unpack the parameter dict on every
+        # Gauss-point batch
+        if parameters:
+            bound_fn = functools.partial(cov_fn, **parameters)
+        else:
+            bound_fn = cov_fn
+        k = Explicit(f=bound_fn, parameters={}, n_variables=2, dim=dim)
         self.__kernel = Kernel(f=k)
+
+        # Keep the raw kernel function so that pairwise assembly can
+        # dispatch to its fast path
+        self.__cov_fn = cov_fn
+        self.__cov_par = parameters if parameters is not None else {}
+
+        # Validate any anisotropy tensor up front, so the per-call check
+        # in the distance functions short-circuits during assembly
+        M = self.__cov_par.get('M')
+        if M is not None and dim > 1:
+            _validate_M(M, dim)
  
         
     def kernel(self):
@@ -1236,8 +1872,6 @@ class Covariance(SPDMatrix):
         # Kernel
         k = self.kernel()
         
-        print(self.discretization())
-        
         #
         # Assemble and decompose covariance operator
         # 
@@ -1272,22 +1906,32 @@ class Covariance(SPDMatrix):
             # 
             
             x = dofhandler.get_dof_vertices(subforest_flag=sf)
-            dim = dofhandler.mesh.dim()
-            I,J = np.mgrid[0:n_dofs,0:n_dofs] 
-            X = x[I,:].reshape((n_dofs**2,dim)) 
-            Y = x[J,:].reshape((n_dofs**2,dim))
-            K = k.eval((X,Y)).reshape((n_dofs,n_dofs))
+            if self.__assembly_dtype is not None:
+                #
+                # Evaluate the kernel in reduced precision - halves the
+                # bytes moved through the pairwise assembly
+                #
+                x = x.astype(self.__assembly_dtype)
+            if isinstance(self.__cov_fn, Map):
+                K = pairwise(lambda X,Y: k.eval((X,Y)), x)
+            else:
+                K = pairwise(self.__cov_fn, x, **self.__cov_par)
+
+            # Upcast once for the factorization stage
+            K = K.astype(np.float64, copy=False)
                         
-            # Assemble mass matrix
+            # Assemble mass matrix (kept sparse for the sandwich product)
             assembler = Assembler([[m]], mesh, subforest_flag=sf)
             assembler.assemble()
-            M = assembler.get_matrix(i_problem=0).toarray()
-            
-            # Define discretized covariance operator
-            C = M.dot(K.dot(M.T))
-            
+            M = assembler.get_matrix(i_problem=0).tocsr()
+
+            # Define discretized covariance operator M*K*M' using
+            # sparse-times-dense products - the mass matrix has O(n)
+            # nonzeros, so this avoids two dense n^3 multiplications
+            C = M.dot(M.dot(K).T).T
+
             # Compute generalized eigendecomposition
-            lmd, V = linalg.eigh(C,M)
+            lmd, V = linalg.eigh(C, M.toarray())
          
         else:
             raise Exception('Only "interpolation", "galerkin", '+\
@@ -1301,7 +1945,7 @@ class Covariance(SPDMatrix):
         # Rearrange to ensure decreasing order
         lmd = lmd[::-1]
         V = V[:,::-1]
-        covariance = V.dot(np.diag(lmd).dot(V.T))
+        covariance = (V*lmd[None,:]).dot(V.T)
         
         # 
         # Initialize as SPDMatrix  
@@ -1472,10 +2116,14 @@ class GaussianField(object):
             assert k<=n, 'Number of columns in "support" cannot exceed '+\
                 'number of rows.'
             
-            # Check orthogonality
-            I = np.identity(k)
-            assert np.allclose(support.T.dot(support),I), 'Basis vectors '+\
-                'support should be orthonormal.'
+            # Check orthogonality with a randomized probe: orthonormal
+            # columns V satisfy V'(Vz) = z for every z, so testing a
+            # handful of random vectors costs O(n*k) per probe instead
+            # of the O(n*k^2) Gram matrix.
+            p = min(k, 10)
+            Z = np.random.randn(k, p)
+            assert np.allclose(support.T.dot(support.dot(Z)), Z), \
+                'Basis vectors support should be orthonormal.'
             
         # Store support vectors 
         self.__support = support
@@ -1582,9 +2230,12 @@ class GaussianField(object):
             assert type(n_copies) is np.int, \
                 'Number of copies should be an integer.'
             if n_copies == 1:
-                return mu 
+                return mu
             else:
-                return np.tile(mu, (1, n_copies))
+                # Zero-copy view: broadcasting repeats the column
+                # without materializing an (n, n_copies) array -
+                # callers add or read it, never write into it
+                return np.broadcast_to(mu, (mu.shape[0], n_copies))
         else:
             return mu
     
@@ -1656,7 +2307,7 @@ class GaussianField(object):
         Vk = V[:,:level]
         
         # Define truncated Covariance matrix
-        K = SPDMatrix(Vk.dot(np.diag(dk)).dot(Vk.T))
+        K = SPDMatrix((Vk*dk[None,:]).dot(Vk.T))
         K.set_eig_decomp(dk, Vk)
         
         # Return Gaussian field with truncated covariance
@@ -1739,6 +2390,9 @@ class GaussianField(object):
             #
             # Extract number of samples from z
             #  
+            if len(z.shape) == 1:
+                # Promote a single flat sample to a column vector
+                z = z[:,None]
             assert len(z.shape) == 2, \
                 'Input "z" should have size (n, n_samples).'
             if z.shape[0] > K.size():
@@ -1759,11 +2413,21 @@ class GaussianField(object):
             #
             # Return Lz + mean
             #
+            if decomposition=='eig' and K.has_eig_decomp():
+                #
+                # A truncated eigendecomposition retains k < n modes and
+                # needs only k normal deviates per sample
+                #
+                n_modes = K.get_eig_decomp()[1].shape[1]
+                z = z[:n_modes,:]
             Lz = K.sqrt(z, decomposition=decomposition)
             V = self.support()
             if V is not None:
                 Lz = V.dot(Lz)
-            return  Lz + self.mean(col=m_col, n_copies=n_samples)
+
+            # Lz is a fresh array, so the mean can be added in place
+            Lz += self.mean(col=m_col, n_copies=n_samples)
+            return  Lz
                 
         elif mode=='precision':
             #
@@ -1772,9 +2436,11 @@ class GaussianField(object):
             Lz = K.sqrt_solve(z,transpose=True, decomposition=decomposition)
             V = self.support()
             if V is not None:
-                Lz = V.dot(Lz)  
-            mu = self.mean(col=m_col, n_copies=n_samples)
-            return Lz + mu
+                Lz = V.dot(Lz)
+
+            # Lz is a fresh array, so the mean can be added in place
+            Lz += self.mean(col=m_col, n_copies=n_samples)
+            return Lz
                        
         elif mode=='canonical':
             #
@@ -1864,7 +2530,6 @@ class GaussianField(object):
             #
             # Compute K*A.T and A*K*A.T
             #  
-            print('Computing KAT and AKAT') 
             if mode=='covariance':    
                 KAT  = K.dot(Ak.T)
                 AKAT = Ak.dot(KAT)
@@ -1879,20 +2544,16 @@ class GaussianField(object):
                 # 
                 
                 # Sample unconditioned field 
-                print('Sampling from unconditioned field')
                 Xs = self.sample(z=z, n_samples=n_samples, mode=mode, 
                                  decomposition=decomposition)            
                 
                 # Compute residual
-                print('Computing residual')
                 r = A.dot(Xs)-e
                 
                 # Conditional covariance 
-                print('Computing conditional covariance')
-                U = linalg.solve(AKAT,r)
+                U = linalg.solve(AKAT,r,assume_a='pos')
                 
                 # Apply correction 
-                print('Applying correction')
                 X = Xs - Vk.dot(KAT.dot(U))
                 
                 return X
@@ -1902,12 +2563,16 @@ class GaussianField(object):
                 # Return GaussianField
                 # 
                 
+                # Factor AKAT (positive definite) once and reuse it for
+                # both the mean and the covariance correction
+                AKAT_cho = linalg.cho_factor(AKAT, lower=True)
+
                 # Conditional mean
                 r = Ak.dot(mu_k)-ek
-                mu_cnd = mu - Vk.dot(KAT.dot(linalg.solve(AKAT,r)))
-                
+                mu_cnd = mu - Vk.dot(KAT.dot(linalg.cho_solve(AKAT_cho,r)))
+
                 # Conditional covariance
-                U = linalg.solve(AKAT, KAT.T)
+                U = linalg.cho_solve(AKAT_cho, KAT.T)
                 K_cnd = K.get_matrix() - KAT.dot(U)
                 K_cnd = Vk.dot(K_cnd.dot(Vk.T))
                 
@@ -1953,7 +2618,7 @@ class GaussianField(object):
                 r = A.dot(Xs)-e
                 
                 # Conditional covariance 
-                U = linalg.solve(Ko+AKAT,r)
+                U = linalg.solve(Ko+AKAT,r,assume_a='pos')
                 
                 # Apply correction 
                 X = Xs - KAT.dot(U)
@@ -1961,11 +2626,15 @@ class GaussianField(object):
                 return X
             
             elif output=='field':
+                # Factor the noise covariance (positive definite) once
+                # and reuse it for the mean and the precision update
+                Ko_cho = linalg.cho_factor(Ko, lower=True)
+
                 # Conditional mean
-                mu_cnd = mu - A.T.dot(linalg.solve(Ko,e))
-                
+                mu_cnd = mu - A.T.dot(linalg.cho_solve(Ko_cho,e))
+
                 # Conditional precision
-                Q_cnd = Q + A.T.dot(linalg.solve(Ko,A))
+                Q_cnd = Q + A.T.dot(linalg.cho_solve(Ko_cho,A))
                 
                 # Random field
                 X = GaussianField(self.size(), mean=mu_cnd, K=Q_cnd, 
@@ -2174,7 +2843,10 @@ class GaussianField(object):
                 Q = self.precision()
                 V = Q.chol_solve(A.T)
                 W = A.dot(V)
-                U = linalg.solve(W,V.T)
+                # W = A*Q^{-1}*A' is positive definite - let
+                # LAPACK use a Cholesky solve instead of a
+                # general LU
+                U = linalg.solve(W,V.T,assume_a='pos')
                 if output=='sample':
                     #
                     # Sample
@@ -2206,7 +2878,8 @@ class GaussianField(object):
                 K = self.covariance().get_matrix()
                 V = K.dot(A.T)
                 W = A.dot(V)
-                U = linalg.solve(W,V.T)
+                # W = A*K*A' is positive definite
+                U = linalg.solve(W,V.T,assume_a='pos')
                 if output=='sample':
                     #
                     # Sample
@@ -2282,10 +2955,17 @@ class HaarField(GaussianField):
     """
     Multiresolution Gaussian random field parametrized by Haar wavelets over a nested mesh
     """
-    def __init__(self):
+    def __init__(self, size, mean=None, K=None, mode='covariance',
+                 support=None):
         """
+        Constructor
+
+        Inputs: see GaussianField - the wavelet parametrization is not
+            implemented yet, but initializing the base class makes the
+            cached factorization and sampling machinery usable.
         """
-        pass
+        GaussianField.__init__(self, size, mean=mean, K=K, mode=mode,
+                               support=support)
     
     
 '''    
@@ -2429,16 +3109,17 @@ class KLField(GaussianField):
             Y = x[J,:].reshape((n_dofs**2,dim))
             K = k.eval((X,Y)).reshape((n_dofs,n_dofs))
                         
-            # Assemble mass matrix
+            # Assemble mass matrix (kept sparse for the sandwich product)
             assembler = Assembler([[m]], mesh, subforest_flag=subforest_flag)
             assembler.assemble()
-            M = assembler.af[0]['bilinear'].get_matrix().toarray()
-            
-            # Define discretized covariance operator
-            C = M.dot(K.dot(M.T))
-            
+            M = assembler.af[0]['bilinear'].get_matrix().tocsr()
+
+            # Define discretized covariance operator M*K*M' using
+            # sparse-times-dense products
+            C = M.dot(M.dot(K).T).T
+
             # Compute generalized eigendecomposition
-            lmd, V = linalg.eigh(C,M)
+            lmd, V = linalg.eigh(C, M.toarray())
             
         else:
             raise Exception('Only "interpolation", "galerkin", '+\
@@ -2665,26 +3346,41 @@ class EllipticField(GaussianField):
         # 
         M = assembler.get_matrix(1)
         m_lumped = np.array(M.sum(axis=1)).squeeze()
-        
-            
+
+        # Inverse lumped-mass scalings, computed once. Applying them by
+        # elementwise column scaling touches K's nonzeros in a single
+        # pass, instead of building a sparse diagonal matrix and a
+        # matrix-matrix product per use.
+        inv_m = 1.0/m_lumped
+        inv_sqrt_m = 1.0/np.sqrt(m_lumped)
+
         if np.mod(gamma,2) == 0:
             #
             # Even power alpha
-            # 
+            #
             Q = cholesky(K.tocsc())
             count = 1
         else:
             #
             # Odd power gamma
-            # 
-            Q = cholesky_AAt((K.dot(sp.diags(1/np.sqrt(m_lumped)))).tocsc())
+            #
+            Q = cholesky_AAt(K.multiply(inv_sqrt_m[np.newaxis,:]).tocsc())
             count = 2
-        
+
+        if count < gamma:
+            #
+            # The mass-scaled stiffness matrix is constant across the
+            # fractional-power iterations - build it once, in CSR for
+            # the row-major products below
+            #
+            K_scaled = K.multiply(inv_m[np.newaxis,:]).tocsr()
+
         while count < gamma:
             #
             # Update Q
             #
-            Q = cholesky_AAt((K.dot(sp.diags(1/m_lumped)).dot(Q.apply_Pt(Q.L()))).tocsc()) 
+            A_lower = Q.apply_Pt(Q.L())
+            Q = cholesky_AAt(K_scaled.dot(A_lower).tocsc())
             count += 2
         # Save precision matrix
         GaussianField.__init__(self, n_dofs, mean=mean.data(), \
@@ -3583,9 +4279,14 @@ class GMRF(object):
             # Compute eigendecomposition if necessary
             if not K.has_eig_decomp():
                 K.compute_eig_decomp()
-            
+
+            # A truncated decomposition retains k < n modes and needs only
+            # k normal deviates per sample
+            dummy, V = K.get_eig_decomp()
+            n_modes = V.shape[1]
+
             # Return Lz + mean
-            return K.eig_sqrt(z) + self.mean(n_copies=n_samples)
+            return K.eig_sqrt(z[:n_modes,:]) + self.mean(n_copies=n_samples)
             
         elif mode=='precision':
             #
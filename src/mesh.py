@@ -241,6 +241,10 @@ class Tree(object):
 
 
     """
+    __slots__ = ('_is_regular', '_parent', '_forest', '_in_forest',
+                 '_node_position', '_flags', '_node_type', '_node_depth',
+                 '_node_address', '_node_root', '_children', '_n_children')
+
     def __init__(self, n_children=None, regular=True, flag=None,
                  parent=None, position=None, forest=None):
         """
@@ -275,6 +279,7 @@ class Tree(object):
             self._node_type = 'ROOT'
             self._node_depth = 0
             self._node_address = []
+            self._node_root = self
 
             if self.is_regular():
                 # Ensure that the number of ROOT children is specified
@@ -320,9 +325,11 @@ class Tree(object):
 
             self._node_type = 'LEAF'
 
-            # Determine cell's depth and address
+            # Determine cell's depth, address, and root (inherited from the
+            # parent, so that get_root is a single attribute read).
             self._node_depth = parent.get_depth() + 1
             self._node_address = parent.get_node_address() + [position]
+            self._node_root = parent._node_root
 
             if regular:
                 #
@@ -635,10 +642,7 @@ class Tree(object):
         """
         Find the ROOT cell for a given cell
         """
-        if self._node_type == 'ROOT':
-            return self
-        else:
-            return self._parent.get_root()
+        return self._node_root
 
 
     def has_children(self, position=None, flag=None):
@@ -716,27 +720,14 @@ class Tree(object):
               Use this to obtain a consistent iteration of children
         """
 
-        if self.has_children(flag=flag):
-            if not reverse:
-                #
-                # Go in usual order
-                #
-                for child in self._children:
-                    if child is not None:
-                        if flag is None:
-                            yield child
-                        elif child.is_marked(flag):
-                            yield child
-            else:
-                #
-                # Go in reverse order
-                #
-                for child in reversed(self._children):
-                    if child is not None:
-                        if flag is None:
-                            yield child
-                        elif child.is_marked(flag):
-                            yield child
+        #
+        # Go in usual (or reverse) order
+        #
+        children = self._children if not reverse else reversed(self._children)
+        for child in children:
+            if child is not None:
+                if flag is None or child.is_marked(flag):
+                    yield child
 
 
     def n_children(self):
@@ -885,26 +876,39 @@ class Tree(object):
 
             The rooted subtree must contain all ancestors of a marked node
         """
+        if mode == 'depth-first':
+            reverse = True
+        elif mode == 'breadth-first':
+            reverse = False
+        else:
+            raise Exception('Input "mode" must be "depth-first"'+\
+                            ' or "breadth-first".')
         #
-        # Get all leaves of the subtree
+        # Get all (marked) leaves of the subtree
+        #
+        # The traversal is inlined here (rather than delegated to traverse),
+        # so that leaves can be collected in a single pass without generator
+        # overhead or an intermediate list of unfiltered leaves.
         #
         leaves = []
-        for node in self.traverse(flag=subtree_flag, mode=mode):
-            #
-            # Iterate over all sub-nodes within subtree
-            #
+        queue = deque([self])
+        while len(queue) != 0:
+            node = queue.pop() if reverse else queue.popleft()
+            if node.has_children():
+                for child in node.get_children(reverse=reverse):
+                    queue.append(child)
+            if subtree_flag is not None and not node.is_marked(subtree_flag):
+                #
+                # Node not within rooted subtree
+                #
+                continue
             if not node.has_children(flag=subtree_flag):
                 #
                 # Nodes without marked children are the subtree leaves
                 #
-                leaves.append(node)
-        #
-        # Return marked leaves
-        #
-        if flag is None:
-            return leaves
-        else:
-            return [leaf for leaf in leaves if leaf.is_marked(flag)]
+                if flag is None or node.is_marked(flag):
+                    leaves.append(node)
+        return leaves
 
 
     def make_rooted_subtree(self, flag):
@@ -1223,20 +1227,38 @@ class Forest(object):
 
             The rooted subtree must contain all ancestors of a marked node
         """
+        if mode == 'depth-first':
+            reverse = True
+            queue = deque(reversed(self._trees))
+        elif mode == 'breadth-first':
+            reverse = False
+            queue = deque(self._trees)
+        else:
+            raise Exception('Input "mode" must be "depth-first"'+\
+                            ' or "breadth-first".')
         #
-        # Get all leaves of the subtree
+        # Get all (marked) leaves of the subtrees, collecting them in a
+        # single inlined traversal (see Tree.get_leaves).
         #
         leaves = []
-        for node in self.traverse(flag=subforest_flag, mode=mode):
+        while len(queue) != 0:
+            node = queue.pop() if reverse else queue.popleft()
+            if node.has_children():
+                for child in node.get_children(reverse=reverse):
+                    queue.append(child)
+            if subforest_flag is not None and \
+                    not node.is_marked(subforest_flag):
+                #
+                # Node not within rooted subforest
+                #
+                continue
             if not node.has_children(flag=subforest_flag):
-                leaves.append(node)
-        #
-        # Return marked leaves
-        #
-        if flag is None:
-            return leaves
-        else:
-            return [leaf for leaf in leaves if leaf.is_marked(flag)]
+                #
+                # Nodes without marked children are the subforest leaves
+                #
+                if flag is None or node.is_marked(flag):
+                    leaves.append(node)
+        return leaves
 
 
     def root_subtrees(self, flag):
@@ -1774,7 +1796,8 @@ class Vertex(object):
 
     Methods:
     """
-
+    __slots__ = ('__coordinate', '_flags', '__dim', '__periodic_pair',
+                 '__is_periodic')
 
     def __init__(self, coordinates):
         """
@@ -3259,6 +3282,8 @@ class Cell(Tree):
     Cell object: A two dimensional polygon
 
     """
+    __slots__ = ('_half_edges', '_vertex_coords')
+
     def __init__(self, half_edges, n_children=0, parent=None, position=None, grid=None):
         """
         Constructor
@@ -3309,6 +3334,21 @@ class Cell(Tree):
         #
         self.check_winding_order()
 
+        # Vertex coordinate array, computed on first use (cell geometry is
+        # fixed on construction).
+        self._vertex_coords = None
+
+
+    def _vertex_coordinate_array(self):
+        """
+        Returns the (n_vertices, 2) array of vertex coordinates, ordered by
+        the cell's half-edge bases. The array is cached, so that geometric
+        queries need not re-read the coordinates vertex by vertex.
+        """
+        if self._vertex_coords is None:
+            self._vertex_coords = convert_to_array(self.get_vertices(), 2)
+        return self._vertex_coords
+
 
     def n_half_edges(self):
         """
@@ -3376,11 +3416,9 @@ class Cell(Tree):
         Returns the cell's bounding box in the form of a tuple (x0,x1,y0,y1),
         so that the cell is contained in the rectangle [x0,x1]x[y0,y1]
         """
-        xy = convert_to_array(self.get_vertices(), 2)
-        x0 = np.min(xy[:,0], axis=0)
-        x1 = np.max(xy[:,0], axis=0)
-        y0 = np.min(xy[:,1], axis=0)
-        y1 = np.max(xy[:,1], axis=0)
+        xy = self._vertex_coordinate_array()
+        x0, y0 = xy.min(axis=0)
+        x1, y1 = xy.max(axis=0)
         return x0, x1, y0, y1
 
 
@@ -3561,19 +3599,19 @@ class Cell(Tree):
         xy = convert_to_array(points, 2)
         x,y = xy[:,0], xy[:,1]
 
-        n_points = len(x)
-        in_cell = np.ones(n_points, dtype=np.bool)
-
-        for half_edge in self.get_half_edges():
-            #
-            # Traverse vertices in counter-clockwise order
-            #
-            x0, y0 = half_edge.base().coordinates()
-            x1, y1 = half_edge.head().coordinates()
+        #
+        # Left-of-edge test for all half-edges at once, using the cached
+        # vertex coordinate array (counter-clockwise order) instead of
+        # reading coordinates edge by edge.
+        #
+        v = self._vertex_coordinate_array()
+        x0, y0 = v[:,0], v[:,1]
+        dx = np.roll(x0,-1) - x0
+        dy = np.roll(y0,-1) - y0
 
-            # Determine which points lie outside cell
-            pos_means_left = (y-y0)*(x1-x0)-( x-x0)*(y1-y0)
-            in_cell[pos_means_left<-tol] = False
+        # Points strictly to the right of any edge lie outside the cell
+        pos_means_left = np.outer(dx,y) - np.outer(dy,x) + (dy*x0-dx*y0)[:,None]
+        in_cell = np.all(pos_means_left>=-tol, axis=0)
 
         """
         if len(in_cell)==1:
@@ -3616,10 +3654,17 @@ class Cell(Tree):
         return False
 
 
+# Offset of each child quadcell (SW, SE, NE, NW) within the reference cell
+# [0,1]x[0,1], precomputed once so that position lookups remain table-driven.
+_QUADCELL_CHILD_OFFSETS = np.array([[0,0],[1,0],[1,1],[0,1]], dtype=float)
+
+
 class QuadCell(Cell, Tree):
     """
     Quadrilateral cell
     """
+    __slots__ = ('_is_rectangle',)
+
     def __init__(self, half_edges, parent=None, position=None, grid=None):
         """
         Constructor
@@ -3775,12 +3820,10 @@ class QuadCell(Cell, Tree):
         
         #
         # Determine relative position
-        #         
-        sign = np.array([[0,0],[1,0],[0,1],[-1,0],[0,-1]])
+        #
         rel_position = np.array([0,0], dtype=float)
         for level,pos in enumerate(rel_address):
-            for i in range(pos+1):
-                rel_position += 2**(-(level+1))*sign[i]
+            rel_position += 2**(-(level+1))*_QUADCELL_CHILD_OFFSETS[pos]
         
         # Compute the width of the reference cell
         width = 2**(-(level+1))
@@ -3918,9 +3961,9 @@ class QuadCell(Cell, Tree):
         assert x_in.shape[1]==2, 'Input "x" has incorrect dimension.'
 
         #
-        # Get cell corner vertices
+        # Get cell corner vertices (cached - corners don't move)
         #
-        x_verts = convert_to_array(self.get_vertices())
+        x_verts = self._vertex_coordinate_array()
         p_sw_x, p_sw_y = x_verts[0,:]
         p_se_x, p_se_y = x_verts[1,:]
         p_ne_x, p_ne_y = x_verts[2,:]
@@ -5626,23 +5669,26 @@ class DCEL(object):
             n_points = (nx+1)*(ny+1)
             self.points['n'] = n_points
             #
-            # Record vertices
+            # Record vertices (x varies fastest), computed in one
+            # vectorized pass rather than by appending point by point
             #
             x = np.linspace(x_min, x_max, nx+1)
             y = np.linspace(y_min, y_max, ny+1)
-            for i_y in range(ny+1):
-                for i_x in range(nx+1):
-                    self.points['coordinates'].append((x[i_x],y[i_y]))
+            X, Y = np.meshgrid(x,y)
+            self.points['coordinates'] = \
+                list(zip(X.ravel().tolist(), Y.ravel().tolist()))
             #
             # Face connectivities
             #
             # Vertex indices
             idx = np.arange((nx+1)*(ny+1)).reshape(ny+1,nx+1).T
-            for i_y in range(ny):
-                for i_x in range(nx):
-                    fv = [idx[i_x,i_y], idx[i_x+1,i_y],
-                          idx[i_x+1,i_y+1], idx[i_x,i_y+1]]
-                    self.faces['connectivity'].append(fv)
+
+            # Corner indices (SW, SE, NE, NW) of all faces at once
+            sw, se = idx[:-1,:-1], idx[1:,:-1]
+            ne, nw = idx[1:,1:], idx[:-1,1:]
+            self.faces['connectivity'] = \
+                np.stack((sw.T.ravel(), se.T.ravel(),
+                          ne.T.ravel(), nw.T.ravel()), axis=1).tolist()
             self.faces['n'] = nx*ny
             self.faces['type'] = ['quadrilateral']*self.faces['n']
 
@@ -6131,16 +6177,23 @@ class DCEL(object):
         # =====================================================================
         # Determine twin half_edges
         # =====================================================================
+        #
+        # Hash each half-edge by its (base, head) vertex pair, so that the
+        # twin is found by a single dictionary lookup on the reversed pair,
+        # rather than a scan over all half-edge rows (quadratic in n_he).
+        #
+        i_he_by_vertex_pair = \
+            {(hec[i,0], hec[i,1]): i for i in range(n_he)}
         for i in range(n_he):
             #
-            # Find the row whose reversed entries match current entry
+            # Look up the half-edge with reversed entries
             #
-            row = np.argwhere((hec[:,0]==hec[i,1]) & (hec[:,1]==hec[i,0]))
-            if len(row) == 1:
+            i_twin = i_he_by_vertex_pair.get((hec[i,1], hec[i,0]))
+            if i_twin is not None:
                 #
                 # Update twin field
                 #
-                self.half_edges['twin'][i] = int(row)
+                self.half_edges['twin'][i] = i_twin
 
         """
         # =====================================================================
@@ -6466,28 +6519,27 @@ class DCEL(object):
                 #
                 # Look for twin half-edges
                 #
-                n_right = len(left_hes)
-                n_left = len(right_hes)
-                assert n_right==n_left, \
+                assert len(left_hes)==len(right_hes), \
                     'Number of half-edges on either side of domain differ.'+\
                     'Cannot make periodic.'
-                while len(left_hes)>0:
-                    l_he, l_ybase, l_yhead = left_hes.pop()
-                    for ir in range(len(right_hes)):
-                        #
-                        # For each halfedge on the left, check if there is a
-                        # corresponding one on the right.
-                        #
-                        r_he, r_ybase, r_yhead = right_hes[ir]
-                        if np.isclose(l_ybase, r_yhead) and np.isclose(l_yhead, r_ybase):
-                            self.half_edges['twin'][l_he] = r_he
-                            self.half_edges['twin'][r_he] = l_he
-                            del right_hes[ir]
-                            break
+                if len(left_hes)>0:
+                    #
+                    # Compare all left/right coordinate signatures at once,
+                    # rather than scanning the right half-edges per left one.
+                    #
+                    l_he, l_ybase, l_yhead = (np.array(s) for s in zip(*left_hes))
+                    r_he, r_ybase, r_yhead = (np.array(s) for s in zip(*right_hes))
+
+                    match = np.isclose(l_ybase[:,None], r_yhead[None,:]) & \
+                            np.isclose(l_yhead[:,None], r_ybase[None,:])
+                    ir = np.argmax(match, axis=1)
+
+                    assert np.all(match[np.arange(len(l_he)), ir]), \
+                        'All HalfEdges on the left should be matched with '+\
+                        'one on the right.'
 
-                assert len(right_hes)==0, \
-                    'All HalfEdges on the left should be matched with '+\
-                    'one on the right.'
+                    self.half_edges['twin'][l_he] = r_he[ir]
+                    self.half_edges['twin'][r_he[ir]] = l_he
 
             if 1 in coordinates:
                 #
@@ -6518,23 +6570,26 @@ class DCEL(object):
                 #
                 # Look for twin half-edges
                 #
-                while len(bottom_hes)>0:
-                    b_he, b_xbase, b_xhead = bottom_hes.pop()
-                    for it in range(len(top_hes)):
-                        #
-                        # For each halfedge on the left, check if there is a
-                        # corresponding one on the right.
-                        #
-                        t_he, t_xbase, t_xhead = top_hes[it]
-                        if np.isclose(t_xbase, b_xhead) and np.isclose(t_xhead, b_xbase):
-                            self.half_edges['twin'][b_he] = t_he
-                            self.half_edges['twin'][t_he] = b_he
-                            del top_hes[it]
-                            break
+                assert len(bottom_hes)==len(top_hes), \
+                    'Number of half-edges on either side of domain differ.'+\
+                    'Cannot make periodic.'
+                if len(bottom_hes)>0:
+                    #
+                    # Compare all bottom/top coordinate signatures at once
+                    #
+                    b_he, b_xbase, b_xhead = (np.array(s) for s in zip(*bottom_hes))
+                    t_he, t_xbase, t_xhead = (np.array(s) for s in zip(*top_hes))
+
+                    match = np.isclose(t_xbase[None,:], b_xhead[:,None]) & \
+                            np.isclose(t_xhead[None,:], b_xbase[:,None])
+                    it = np.argmax(match, axis=1)
 
-                assert len(top_hes)==0, \
-                    'All HalfEdges on the left should be matched with '+\
-                    'one on the right.'
+                    assert np.all(match[np.arange(len(b_he)), it]), \
+                        'All HalfEdges on the bottom should be matched with '+\
+                        'one on the top.'
+
+                    self.half_edges['twin'][b_he] = t_he[it]
+                    self.half_edges['twin'][t_he[it]] = b_he
         self.periodic_coordinates = coordinates
 
 
@@ -7075,6 +7130,10 @@ class Mesh2D(Mesh):
         self._is_quadmesh = is_quadmesh
         self.cells = Forest(cells)
 
+        # Bounding boxes of the ROOT cells (computed on demand), used to
+        # narrow down candidate cells during point location.
+        self._root_cell_bnd_boxes = None
+
         # =====================================================================
         # Pair Periodic Vertices
         # =====================================================================
@@ -7133,7 +7192,26 @@ class Mesh2D(Mesh):
             cell: smallest cell that contains x
 
         """
-        for cell in self.cells.get_children():
+        cells = self.cells.get_children()
+        if self._root_cell_bnd_boxes is None:
+            #
+            # Compute and store the ROOT cells' bounding boxes (these don't
+            # change under refinement).
+            #
+            self._root_cell_bnd_boxes = \
+                np.array([cell.bounding_box() for cell in cells])
+        #
+        # Use the bounding boxes to rule out most cells in one vectorized
+        # comparison, before running the exact (and more expensive)
+        # point-in-cell test on the remaining candidates.
+        #
+        x0, x1, y0, y1 = self._root_cell_bnd_boxes.T
+        xy = convert_to_array(point, 2)
+        x, y = xy[0,0], xy[0,1]
+        tol = 1e-10
+        in_box = (x >= x0-tol)*(x <= x1+tol)*(y >= y0-tol)*(y <= y1+tol)
+        for i_cell in np.flatnonzero(in_box):
+            cell = cells[i_cell]
             if flag is None:
                 if cell.contains_points(point):
                     return cell
@@ -7381,47 +7459,51 @@ class Mesh2D(Mesh):
             #
             # Region may lie within interior of the domain
             #
-            for cell in self.cells.get_leaves(subforest_flag=subforest_flag):
+            leaves = self.cells.get_leaves(subforest_flag=subforest_flag)
+            if len(leaves)==0:
+                return
+            #
+            # Evaluate the region function for the vertices of all leaf
+            # cells in one vectorized call (f accepts x- and y-vectors),
+            # rather than once per vertex in Python.
+            #
+            xy_cells = [cell._vertex_coordinate_array() for cell in leaves]
+            i_start = np.cumsum([0]+[len(xy) for xy in xy_cells])
+            xy = np.concatenate(xy_cells, axis=0)
+            in_region = np.asarray(f(xy[:,0], xy[:,1]), dtype=bool)
+            if in_region.ndim==0:
+                # Constant region function
+                in_region = np.full(xy.shape[0], bool(in_region))
+
+            for i_cell, cell in enumerate(leaves):
                 #
-                # Iterate over mesh cells
+                # Iterate over mesh cells: f-values of the cell's vertices,
+                # in half-edge base order
                 #
+                f_cell = in_region[i_start[i_cell]:i_start[i_cell+1]]
                 if entity_type=='vertex':
                     #
                     # Mark vertices
                     #
-                    for v in cell.get_vertices():
-                        x,y = v.coordinates()
-                        if f(x,y):
+                    for v, v_in_region in zip(cell.get_vertices(), f_cell):
+                        if v_in_region:
                             #
                             # Mark vertex
                             #
                             v.mark(flag)
                 elif entity_type=='half_edge':
                     #
-                    # Mark half-edges
+                    # Mark half-edges: each half-edge's base is vertex j,
+                    # its head is vertex j+1 (cyclically)
                     #
-                    for he in cell.get_half_edges():
+                    n_hes = cell.n_half_edges()
+                    for j, he in enumerate(cell.get_half_edges()):
+                        base_in = f_cell[j]
+                        head_in = f_cell[(j+1)%n_hes]
                         if strict_containment:
-                            mark = True
-                            for v in he.get_vertices():
-                                x,y = v.coordinates()
-                                if not f(x,y):
-                                    #
-                                    # Single vertex outside region disqualifies half_edge
-                                    #
-                                    mark = False
-                                    break
+                            mark = base_in and head_in
                         else:
-                            mark = False
-                            for v in he.get_vertices():
-                                x,y = v.coordinates()
-                                if f(x,y):
-                                    #
-                                    # Single vertex in region -> mark half_edge
-                                    #
-                                    mark = True
-                                    break
-
+                            mark = base_in or head_in
                         if mark:
                             #
                             # Mark half_edge
@@ -7436,28 +7518,20 @@ class Mesh2D(Mesh):
                         #
                         # All vertices must be in region
                         #
-                        mark = True
-                        for v in cell.get_vertices():
-                            x,y = v.coordinates()
-                            if not f(x,y):
-                                mark = False
-                                break
+                        mark = f_cell.all()
                     else:
                         #
                         # Only one vertex need be in region
                         #
-                        mark = False
-                        for v in cell.get_vertices():
-                            x,y = v.coordinates()
-                            if f(x,y):
-                                mark = True
-                                break
+                        mark = f_cell.any()
 
                     if mark:
                         #
                         # Mark cell
                         #
                         cell.mark(flag)
+                else:
+                    raise Exception('Entity %s not supported'%(entity_type))
 
 
     def tear_region(self, flag, subforest_flag=None):
@@ -7820,71 +7894,74 @@ class QuadMesh(Mesh2D):
         """
         assert self.cells.subtrees_rooted(subforest_flag)
         #
-        # Get all LEAF cells
+        # Iterate to a fixed point: sweep a FIFO worklist of cells, split
+        # any cell with a neighbor more than one level finer, and re-enqueue
+        # the cells affected by the split until nothing changes.
         #
-        leaves = set(self.cells.get_leaves(subforest_flag=subforest_flag))  # set: no duplicates
-        while len(leaves)>0:
-            leaf = leaves.pop()
+        queue = deque(self.cells.get_leaves(subforest_flag=subforest_flag))
+        in_queue = set(queue)  # track membership: no duplicates in worklist
+        while len(queue)>0:
+            leaf = queue.popleft()
+            in_queue.discard(leaf)
             #
-            # For each Cell
+            # Determine whether any neighbor is more than one level finer
             #
-            is_split = False
+            needs_split = False
             for half_edge in leaf.get_half_edges():
                 #
                 # Look for neighbors in each direction
                 #
                 nb = leaf.get_neighbors(half_edge, flag=subforest_flag)
-                if nb is not None and nb.has_children(flag=subforest_flag):
-                    #
-                    # Check if neighbor has children (still fine)
-                    #
-                    twin = half_edge.twin()
-                    for the_child in twin.get_children():
-                        if the_child.cell().has_children(flag=subforest_flag):
-                            #
-                            # Neighbor has grandchildren
-                            #
-                            if not leaf.has_children(flag=subforest_flag):
-                                #
-                                # LEAF does not have any flagged children
-                                #
-                                if leaf.has_children():
-                                    #
-                                    # LEAF has children (just not flagged)
-                                    #
-                                    for child in leaf.get_children():
-                                        child.mark(subforest_flag)
-                                else:
-                                    #
-                                    # LEAF needs new children.
-                                    #
-                                    leaf.split(flag=subforest_flag)
-                                #
-                                # Add children to the leaf nodes to be considered
-                                #
-                                for child in leaf.get_children():
-                                    leaves.add(child)
-
-                                #
-                                # If LEAF is split, add all its neighbors to leaves
-                                # to be considered for splitting.
-                                #
-                                for half_edge in leaf.get_half_edges():
-                                    hep = half_edge.get_parent()
-                                    if hep is not None:
-                                        hep_twin = hep.twin()
-                                        if hep_twin is not None:
-                                            leaves.add(hep_twin.cell())
-                            #
-                            # Current LEAF cell has been split, move on to next one
-                            #
-                            is_split = True
-                            break
-                if is_split:
-                    #
-                    # LEAF already split, no need to check other directions
-                    #
+                if nb is None or not nb.has_children(flag=subforest_flag):
+                    continue
+                #
+                # Neighbor has children - check for grandchildren
+                #
+                twin = half_edge.twin()
+                for the_child in twin.get_children():
+                    if the_child.cell().has_children(flag=subforest_flag):
+                        needs_split = True
+                        break
+                if needs_split:
                     break
+            if not needs_split or leaf.has_children(flag=subforest_flag):
+                #
+                # Cell conforms to the 2:1 rule (or is already refined)
+                #
+                continue
+            #
+            # Refine the cell
+            #
+            if leaf.has_children():
+                #
+                # LEAF has children (just not flagged)
+                #
+                for child in leaf.get_children():
+                    child.mark(subforest_flag)
+            else:
+                #
+                # LEAF needs new children.
+                #
+                leaf.split(flag=subforest_flag)
+            #
+            # Add children to the worklist - they may violate the rule too
+            #
+            for child in leaf.get_children():
+                if child not in in_queue:
+                    queue.append(child)
+                    in_queue.add(child)
+            #
+            # The split may unbalance coarser neighbors - reconsider them
+            #
+            for half_edge in leaf.get_half_edges():
+                hep = half_edge.get_parent()
+                if hep is not None:
+                    hep_twin = hep.twin()
+                    if hep_twin is not None:
+                        nbr = hep_twin.cell()
+                        if nbr not in in_queue:
+                            queue.append(nbr)
+                            in_queue.add(nbr)
 
 
 
@@ -358,10 +358,11 @@ class LinearSystem(object):
         
         # Store matrix
         self.__A = A
-        
-        # Mark matrix as unfactored and unconstrained.              
+
+        # Mark matrix as unfactored and unconstrained.
         self.__A_is_factored = False
         self.__A_is_constrained = False
+        self.__invA = None
     
     
     def get_matrix(self):
@@ -526,8 +527,20 @@ class LinearSystem(object):
     def matrix_is_factored(self):
         """
         Determine whether the matrix has been factored
-        """       
+        """
         return self.__A_is_factored
+
+
+    def factor_matrix(self):
+        """
+        Compute and store the sparse LU factorization of the (constrained)
+        system matrix. Subsequent solves - including ones with multiple
+        right hand sides - reuse the factorization instead of refactoring
+        the matrix for every call.
+        """
+        A = self.get_matrix()
+        self.__invA = linalg.splu(A.tocsc())
+        self.__A_is_factored = True
     
     
     def matrix_is_constrained(self):
@@ -579,13 +592,18 @@ class LinearSystem(object):
         # Solve the linear system
         #
     
-        # Convert to sparse column format
         if factor:
-            A = A.tocsc()
-            b = sparse.csc_matrix(b)
-            u = self.__invA.solve(b.toarray())    
+            #
+            # Reuse the stored LU factorization (handles one or several
+            # right hand sides in a single solve)
+            #
+            if not self.matrix_is_factored():
+                self.factor_matrix()
+            if sparse.issparse(b):
+                b = b.toarray()
+            u = self.__invA.solve(np.asarray(b))
         else:
-            u = linalg.spsolve(self.get_matrix(), self.get_rhs())    
+            u = linalg.spsolve(self.get_matrix(), self.get_rhs())
         if len(u.shape)==1:
             u = u[:,None]
             
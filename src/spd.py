@@ -631,8 +631,8 @@ class EigenDecomposition(object):
         
         V = self.__V  # eigenvectors
         d = self.__d  # eigenvalues
-        D_inv = diagonal_inverse(d, eps=eps)
-        return V.dot(D_inv.dot(np.dot(V.T, b)))
+        d_inv = diagonal_inverse(d, eps=eps, as_diag=True)
+        return V.dot((np.dot(V.T, b).T*d_inv).T)
 
     def sqrt(self,x, transpose=False):
         """
@@ -674,17 +674,17 @@ class EigenDecomposition(object):
         """
         V = self.__V  # eigenvectors
         d = self.__d  # eigenvalues
-        sqrtD_inv = diagonal_inverse(np.sqrt(d))
+        sqrtd_inv = diagonal_inverse(np.sqrt(d), as_diag=True)
         if transpose:
             #
             # Solve sqrtD*V'x = b
-            # 
-            return V.dot(sqrtD_inv.dot(b))
+            #
+            return V.dot((b.T*sqrtd_inv).T)
         else:
             #
             # Solve V*sqrtD x = b
             #
-            return sqrtD_inv.dot(np.dot(V.T, b))
+            return (np.dot(V.T, b).T*sqrtd_inv).T
 
     def compute_nullspace(self, tol=1e-13):
         """
@@ -1,7 +1,8 @@
 import unittest
 from gmrf import SPDMatrix
 from gmrf import diagonal_inverse
-from gmrf import modchol_ldlt  
+from gmrf import modchol_ldlt
+from gmrf import pivoted_cholesky
 import numpy as np
 import scipy.linalg as linalg
 import scipy.sparse as sp
@@ -60,9 +61,23 @@ class TestSPDMatrix(unittest.TestCase):
         L, D, dummy, D0 = modchol_ldlt(K)
         
         self.assertTrue(np.allclose(L.dot(D0.dot(L.T)),K))
-        self.assertFalse(np.allclose(D0,D))
-              
-        
+        self.assertFalse(np.allclose(D0,D.toarray()))
+
+
+    def test_pivoted_cholesky(self):
+        # Rank-deficient PSD matrix
+        n, k = 20, 5
+        B = np.random.rand(n,k)
+        A = B.dot(B.T)
+
+        # Compute low-rank factor
+        L = pivoted_cholesky(A)
+
+        # Check reconstruction and detected rank
+        self.assertTrue(np.allclose(L.dot(L.T),A))
+        self.assertEqual(L.shape[1], k)
+
+
     def test_constructor(self):
         n = 20
         for sparse in [True, False]: